@@ -1,14 +1,26 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from datetime import datetime
+import plotly.io as pio
+from datetime import datetime, timedelta
 import requests
+from requests.adapters import HTTPAdapter
+import orjson
 from math import ceil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 import io
 import geopandas as gpd
-import tempfile, zipfile, os, json
+import tempfile, zipfile, os, json, hashlib
+from pathlib import Path
+
+# Streamlit serializes figures through plotly.io.to_json; orjson is much faster
+pio.json.config.default_engine = "orjson"
 
 # --------------------------------------------
 # Page Setup
@@ -90,11 +102,15 @@ elif region_option == "Upload Shapefile (.zip)":
                 zip_ref.extractall(tmpdir)
             shp_files = [os.path.join(tmpdir, f) for f in os.listdir(tmpdir) if f.endswith(".shp")]
             if shp_files:
-                gdf = gpd.read_file(shp_files[0])
+                gdf = gpd.read_file(shp_files[0], engine="pyogrio")
                 gdf = gdf.to_crs(epsg=4326)
-                gdf["centroid"] = gdf.geometry.centroid
-                for idx, geom in enumerate(gdf["centroid"]):
-                    coords[f"Shape_{idx+1}"] = (geom.y, geom.x)
+                # Point layers are their own centroids; skip the GEOS pass for them
+                if (gdf.geom_type == "Point").all():
+                    centroids = gdf.geometry
+                else:
+                    centroids = gdf.geometry.centroid
+                xy = centroids.get_coordinates().to_numpy()
+                coords.update({f"Shape_{i+1}": (y, x) for i, (x, y) in enumerate(xy)})
                 st.sidebar.success(f"✅ Loaded {len(coords)} centroid(s) from shapefile.")
             else:
                 st.sidebar.error("❌ No .shp file found inside ZIP!")
@@ -105,37 +121,60 @@ elif region_option == "Upload CSV (lat, lon only)":
     if csv_file is not None:
         try:
             df_csv = pd.read_csv(csv_file)
-            if set(df_csv.columns.str.lower()) >= {"latitude", "longitude"}:
-                for i, row in df_csv.iterrows():
-                    coords[f"CSV_Point_{i+1}"] = (row["latitude"], row["longitude"])
+            df_csv.columns = df_csv.columns.str.lower()
+            if set(df_csv.columns) >= {"latitude", "longitude"}:
+                lats = df_csv["latitude"].to_numpy()
+                lons = df_csv["longitude"].to_numpy()
+                coords.update({f"CSV_Point_{i+1}": (lat, lon) for i, (lat, lon) in enumerate(zip(lats, lons))})
                 st.sidebar.success(f"✅ Loaded {len(coords)} point(s) from CSV file.")
             else:
                 st.sidebar.error("❌ CSV must contain 'latitude' and 'longitude' columns only.")
         except Exception as e:
             st.sidebar.error(f"Error reading CSV: {e}")
 
+# All points share batched Open-Meteo requests, so drop any the API would reject
+# (blank, NaN or out of range) rather than letting one bad row fail every region
+def valid_coord(lat, lon):
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return False
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+invalid = [region for region, (lat, lon) in coords.items() if not valid_coord(lat, lon)]
+if invalid:
+    st.sidebar.warning(f"⚠️ Skipped {len(invalid)} point(s) with invalid coordinates: {', '.join(invalid[:5])}"
+                       + (" …" if len(invalid) > 5 else ""))
+    coords = {region: loc for region, loc in coords.items() if region not in invalid}
+
 # --------------------------------------------
 # 🗺️ Mini Map Preview in Sidebar
 # --------------------------------------------
-if coords:
-    st.sidebar.markdown("### 🗺️ Location Preview")
-    df_map = pd.DataFrame(coords).T.reset_index()
-    df_map.columns = ["Region", "Latitude", "Longitude"]
-
-    fig_map = px.scatter_mapbox(
+@st.cache_data(show_spinner=False)
+def build_location_map(points):
+    # Plotly's built-in geo basemap needs no tile server or Mapbox GL bundle
+    df_map = pd.DataFrame(points, columns=["Region", "Latitude", "Longitude"])
+    fig_map = px.scatter_geo(
         df_map,
         lat="Latitude",
         lon="Longitude",
         hover_name="Region",
-        zoom=4.5,
+        scope="asia",
         height=300,
         color_discrete_sequence=["#0072B2"]
     )
-    fig_map.update_layout(
-        mapbox_style="open-street-map",
-        margin=dict(l=0, r=0, t=0, b=0),
+    fig_map.update_geos(
+        center=dict(lat=df_map["Latitude"].mean(), lon=df_map["Longitude"].mean()),
+        projection_scale=5,
+        showcountries=True,
     )
-    st.sidebar.plotly_chart(fig_map, use_container_width=True)
+    fig_map.update_layout(margin=dict(l=0, r=0, t=0, b=0))
+    return fig_map
+
+if coords:
+    st.sidebar.markdown("### 🗺️ Location Preview")
+    points = tuple(sorted((region, float(lat), float(lon)) for region, (lat, lon) in coords.items()))
+    st.sidebar.plotly_chart(build_location_map(points), width="stretch")
 
 # --------------------------------------------
 # Year & Frequency
@@ -143,7 +182,8 @@ if coords:
 year_now = datetime.now().year
 year_range = st.sidebar.slider("Select Year Range", 2014, year_now, (2020, year_now))
 start_date = f"{year_range[0]}-01-01"
-end_date = f"{year_range[1]}-12-31"
+# ERA5 has nothing after today, so don't ask for (and parse) empty future days
+end_date = min(f"{year_range[1]}-12-31", datetime.now().strftime("%Y-%m-%d"))
 
 plot_freq = st.sidebar.selectbox("Plot Frequency", ["Daily", "Weekly", "Monthly", "Yearly"])
 download_freq = st.sidebar.selectbox("Download Data Frequency", ["Daily", "Weekly", "Monthly", "Yearly"])
@@ -151,32 +191,174 @@ download_freq = st.sidebar.selectbox("Download Data Frequency", ["Daily", "Weekl
 # --------------------------------------------
 # Fetch Weather Data (Open-Meteo)
 # --------------------------------------------
-@st.cache_data(show_spinner=False)
-def get_weather_data(lat, lon, start_date, end_date, region):
-    url = (
-        "https://archive-api.open-meteo.com/v1/era5?"
-        f"latitude={lat}&longitude={lon}&start_date={start_date}&end_date={end_date}&"
-        "daily=temperature_2m_max,temperature_2m_min,temperature_2m_mean,"
-        "precipitation_sum,wind_speed_10m_max,wind_speed_10m_mean,wind_direction_10m_dominant"
-        "&timezone=Asia/Kuala_Lumpur"
-    )
+# One pooled keep-alive session for all API calls. The script body reruns on
+# every interaction, so the session lives in st.cache_resource to keep its
+# connections open across reruns and user sessions.
+@st.cache_resource
+def get_session():
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    session.headers["Accept-Encoding"] = "gzip"
+    return session
+
+session = get_session()
+REQUEST_TIMEOUT = 30
+
+# Every variable here feeds the plots, the wind rose and the download CSV
+DAILY_VARS = (
+    "temperature_2m_max", "temperature_2m_min", "temperature_2m_mean",
+    "precipitation_sum", "wind_speed_10m_max", "wind_speed_10m_mean", "wind_direction_10m_dominant",
+)
+# Open-Meteo defaults to km/h; the trend labels and wind rose bands are in m/s
+WIND_SPEED_UNIT = "ms"
+
+def fetch_weather_span(locations, start_date, end_date, variables=DAILY_VARS):
+    # Open-Meteo takes comma-separated coordinate lists and answers with one
+    # daily block per location, so every point is fetched in a single request
+    params = {
+        "latitude": ",".join(str(lat) for lat, _ in locations),
+        "longitude": ",".join(str(lon) for _, lon in locations),
+        "start_date": start_date,
+        "end_date": end_date,
+        "daily": ",".join(variables),
+        "wind_speed_unit": WIND_SPEED_UNIT,
+        "timezone": "Asia/Kuala_Lumpur",
+    }
+    r = session.get("https://archive-api.open-meteo.com/v1/era5", params=params, timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    data = orjson.loads(r.content)
+    if isinstance(data, dict):
+        data = [data]
+
+    frames = []
+    for block in data:
+        daily = block["daily"]
+        # NumPy parses the ISO day strings in C without going through strptime
+        days = np.asarray(daily["time"], dtype="datetime64[D]")
+        dates = pd.DatetimeIndex(days.astype("datetime64[ns]"), name="date")
+        frames.append(pd.DataFrame(
+            {k: np.asarray(v, dtype=np.float32) for k, v in daily.items() if k != "time"},
+            index=dates,
+        ))
+    return frames
+
+def year_spans(start_date, end_date):
+    # Calendar-year windows clipped to the requested range
+    first, last = int(start_date[:4]), int(end_date[:4])
+    return [(max(start_date, f"{y}-01-01"), min(end_date, f"{y}-12-31")) for y in range(first, last + 1)]
+
+# Keeps the comma-joined coordinate lists in the GET URL to a sane length
+MAX_BATCH_LOCATIONS = 50
+
+def fetch_weather_data(locations, start_date, end_date, variables=DAILY_VARS):
+    # Long ranges are split into one request per year and large point sets into
+    # batches, all fetched concurrently, so wall-clock time tracks the slowest
+    # request rather than the sum
+    spans = year_spans(start_date, end_date)
+    batches = [locations[i:i + MAX_BATCH_LOCATIONS] for i in range(0, len(locations), MAX_BATCH_LOCATIONS)]
+    jobs = [(batch, span) for batch in batches for span in spans]
+    if len(jobs) == 1:
+        return fetch_weather_span(locations, start_date, end_date, variables)
+    with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as ex:
+        parts = list(ex.map(lambda job: fetch_weather_span(job[0], *job[1], variables), jobs))
+    # parts is batch-major; stitch each location's years back together in order
+    frames = []
+    for b in range(len(batches)):
+        per_span = parts[b * len(spans):(b + 1) * len(spans)]
+        frames.extend(pd.concat(per_loc) for per_loc in zip(*per_span))
+    return frames
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+def archive_path(lat, lon, start_date, end_date, variables):
+    # The unit is part of the key so files written in km/h are never reused
+    key = hashlib.md5(f"{lat},{lon},{start_date},{end_date},{','.join(variables)},{WIND_SPEED_UNIT}".encode()).hexdigest()
+    return CACHE_DIR / f"{key}.parquet"
+
+def read_archive(path):
+    # A truncated or corrupt file is dropped so its range is simply fetched again
+    if not path.exists():
+        return None
     try:
-        r = requests.get(url)
-        r.raise_for_status()
-        data = r.json()
-        df = pd.DataFrame(data["daily"])
-        df["region"] = region
-        df["date"] = pd.to_datetime(df["time"])
-        return df
-    except Exception as e:
-        st.error(f"❌ Failed to load data for {region}: {e}")
-        return pd.DataFrame()
+        return pd.read_parquet(path)
+    except Exception:
+        path.unlink(missing_ok=True)
+        return None
+
+def write_archive(df, path):
+    # st.cache_data only locks identical arguments, so sessions with overlapping
+    # locations can write the same file at once; each writes its own temp file
+    # and the atomic rename means whichever lands last wins with identical data
+    with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix=".tmp", delete=False) as f:
+        tmp_path = Path(f.name)
+    try:
+        df.to_parquet(tmp_path, compression="zstd")
+        tmp_path.replace(path)
+    except OSError:
+        # The frame is already in memory; a failed write only costs a refetch later
+        tmp_path.unlink(missing_ok=True)
+
+# Settled years of ERA5 never change, so each location's years are kept on disk
+# as Parquet across restarts; only location-years without a file are fetched.
+# Files are keyed per calendar year, so overlapping ranges share them and the
+# store stays bounded at locations x years. There is no expiry, so only ranges
+# ending before ARCHIVE_LAG_DAYS ago go here.
+@st.cache_data(show_spinner=False, max_entries=256)
+def get_archived_weather_data(locations, start_date, end_date, variables=DAILY_VARS):
+    spans = year_spans(start_date, end_date)
+    paths = {(loc, span): archive_path(*loc, *span, variables) for loc in locations for span in spans}
+    frames = {key: read_archive(path) for key, path in paths.items()}
+    missing = {}
+    for (loc, span), df in frames.items():
+        if df is None:
+            missing.setdefault(span, []).append(loc)
+    if missing:
+        CACHE_DIR.mkdir(exist_ok=True)
+        # Each missing year is one batched request; years are fetched concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as ex:
+            fetched = list(ex.map(lambda span: fetch_weather_data(tuple(missing[span]), *span, variables), missing))
+        for (span, locs), span_frames in zip(missing.items(), fetched):
+            for loc, df in zip(locs, span_frames):
+                write_archive(df, paths[loc, span])
+                frames[loc, span] = df
+    return [pd.concat([frames[loc, span] for span in spans]) for loc in locations]
+
+@st.cache_data(show_spinner=False, ttl=86400)
+def get_recent_weather_data(locations, start_date, end_date, variables=DAILY_VARS):
+    return fetch_weather_data(locations, start_date, end_date, variables)
+
+# ERA5 runs about 5 days behind real time and its preliminary ERA5T days can
+# still be revised for a couple of months, so a year is only archived once it
+# ended this long ago
+ARCHIVE_LAG_DAYS = 90
+
+def get_weather_data(locations, start_date, end_date, variables=DAILY_VARS):
+    settled_year = (datetime.now() - timedelta(days=ARCHIVE_LAG_DAYS)).year
+    archive_end = f"{settled_year - 1}-12-31"
+    if end_date <= archive_end:
+        return get_archived_weather_data(locations, start_date, end_date, variables)
+    if start_date > archive_end:
+        return get_recent_weather_data(locations, start_date, end_date, variables)
+    # Split at the year boundary so the settled years come from the disk cache
+    # and a restart only refetches the rest
+    archived = get_archived_weather_data(locations, start_date, archive_end, variables)
+    recent = get_recent_weather_data(locations, f"{settled_year}-01-01", end_date, variables)
+    return [pd.concat(pair) for pair in zip(archived, recent)]
+
+# Points sharing a location (e.g. repeated CSV rows) are only fetched once
+region_locs = {region: (round(float(lat), 4), round(float(lon), 4)) for region, (lat, lon) in coords.items()}
+locations = tuple(dict.fromkeys(region_locs.values()))
 
 data_dict = {}
-for region, (lat, lon) in coords.items():
-    df = get_weather_data(lat, lon, start_date, end_date, region)
-    if not df.empty:
-        data_dict[region] = df
+if locations:
+    try:
+        loc_data = dict(zip(locations, get_weather_data(locations, start_date, end_date)))
+    except Exception as e:
+        st.error(f"❌ Failed to load data: {e}")
+        loc_data = {}
+    for region, loc in region_locs.items():
+        if loc in loc_data and not loc_data[loc].empty:
+            data_dict[region] = loc_data[loc].assign(region=region)
 
 if not data_dict:
     st.warning("No data available. Please select or upload a region.")
@@ -185,13 +367,13 @@ if not data_dict:
 # --------------------------------------------
 # Aggregation
 # --------------------------------------------
-def aggregate_data(df, freq):
-    df = df.copy()
-    df.set_index("date", inplace=True)
-    freq_map = {"Daily": "D", "Weekly": "W", "Monthly": "M", "Yearly": "Y"}
-    rule = freq_map.get(freq, "D")
+def hash_frame(df):
+    return pd.util.hash_pandas_object(df, index=True).values.tobytes()
 
-    df_agg = df.resample(rule).agg({
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_frame})
+def aggregate_data(raw, freq):
+    # Aggregates every region in one groupby pass over the stacked daily frames
+    agg_spec = {
         "temperature_2m_min": "min",
         "temperature_2m_mean": "mean",
         "temperature_2m_max": "max",
@@ -199,19 +381,58 @@ def aggregate_data(df, freq):
         "wind_speed_10m_mean": "mean",
         "wind_speed_10m_max": "max",
         "wind_direction_10m_dominant": "mean"
-    }).reset_index()
-    df_agg["region"] = df["region"].iloc[0]
-    return df_agg
+    }
+    if freq == "Daily":
+        # Source data is already daily, so there is nothing to aggregate
+        df_agg = raw[list(agg_spec) + ["region"]]
+    else:
+        # Group on integer period codes rather than resampling on the slower
+        # non-fixed W/M/Y offsets; label each bin with its last day like resample does
+        period_map = {"Weekly": "W", "Monthly": "M", "Yearly": "Y"}
+        periods = raw.index.to_period(period_map[freq])
+        df_agg = raw.groupby(["region", periods], sort=False, observed=True).agg(agg_spec).reset_index("region")
+        df_agg.index = df_agg.index.to_timestamp(how="end").normalize()
+        df_agg = df_agg[list(agg_spec) + ["region"]]
+    return df_agg.rename_axis("date").reset_index()
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_frame})
+def to_csv_bytes(df):
+    # Arrow formats the CSV in C; write dates as plain YYYY-MM-DD like pandas did
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    date_idx = table.schema.get_field_index("date")
+    table = table.set_column(date_idx, "date", table["date"].cast(pa.date32()))
+    # Arrow's default quotes the header and every string cell; region names
+    # are app-generated, so write them bare like pandas did and only fall
+    # back to quoting if a value ever contains a delimiter or quote
+    buf = io.BytesIO()
+    try:
+        pa_csv.write_csv(table, buf, write_options=pa_csv.WriteOptions(quoting_style="none", quoting_header="none"))
+    except pa.ArrowInvalid:
+        buf = io.BytesIO()
+        pa_csv.write_csv(table, buf)
+    return buf.getvalue()
+
+# Only re-aggregate when an input that feeds the data actually changed;
+# other widget interactions reuse the previous run's results.
+agg_key = (tuple(coords.items()), tuple(data_dict), start_date, end_date, plot_freq, download_freq)
+if st.session_state.get("agg_key") != agg_key:
+    raw = pd.concat(data_dict.values())
+    raw["region"] = pd.Categorical(raw["region"], categories=list(data_dict))
+    agg_plot = aggregate_data(raw, plot_freq)
+    download_df = agg_plot if download_freq == plot_freq else aggregate_data(raw, download_freq)
+    agg_data_dict = {region: df.reset_index(drop=True) for region, df in agg_plot.groupby("region", sort=False, observed=True)}
+    st.session_state["download_df"] = download_df
+    st.session_state["agg_data_dict"] = agg_data_dict
+    st.session_state["agg_key"] = agg_key
+agg_data_dict = st.session_state["agg_data_dict"]
 
 # --------------------------------------------
 # Download Button
 # --------------------------------------------
-download_df = pd.concat([aggregate_data(df, download_freq) for df in data_dict.values()])
-csv_buffer = io.StringIO()
-download_df.to_csv(csv_buffer, index=False)
+# Passing a callable defers CSV encoding until the button is actually clicked
 st.sidebar.download_button(
     label=f"📥 Download {download_freq} Data (CSV)",
-    data=csv_buffer.getvalue(),
+    data=partial(to_csv_bytes, st.session_state["download_df"]),
     file_name=f"weather_data_{download_freq.lower()}.csv",
     mime="text/csv"
 )
@@ -219,48 +440,100 @@ st.sidebar.download_button(
 # --------------------------------------------
 # Plots — Temperature, Wind, Precipitation
 # --------------------------------------------
-st.subheader("📈 Weather Trends by Frequency")
-
-agg_data_dict = {region: aggregate_data(df, plot_freq) for region, df in data_dict.items()}
-
-for region, df in agg_data_dict.items():
-    with st.expander(f"📍 {region} ({plot_freq})", expanded=True):
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            fig_temp = px.line(df, x="date",
-                y=["temperature_2m_min", "temperature_2m_mean", "temperature_2m_max"],
-                labels={"value": "Temperature (°C)", "date": "Date"},
-                title=f"🌡️ Temperature ({region})")
-            fig_temp.update_layout(legend_title_text="Type", legend=dict(orientation="h", y=-0.3))
-            st.plotly_chart(fig_temp, use_container_width=True)
-
-        with col2:
-            fig_wind = px.line(df, x="date",
-                y=["wind_speed_10m_mean", "wind_speed_10m_max"],
-                labels={"value": "Wind Speed (m/s)", "date": "Date"},
-                title=f"💨 Wind Speed ({region})")
-            fig_wind.update_layout(legend_title_text="Type", legend=dict(orientation="h", y=-0.3))
-            st.plotly_chart(fig_wind, use_container_width=True)
-
-        with col3:
-            fig_prep = px.line(df, x="date", y="precipitation_sum",
-                labels={"precipitation_sum": "Precipitation (mm)", "date": "Date"},
-                title=f"🌧️ Precipitation ({region})")
-            fig_prep.update_traces(line_color="#1f77b4")
-            st.plotly_chart(fig_prep, use_container_width=True)
+st.subheader(f"📈 Weather Trends by Frequency ({plot_freq})")
+
+MAX_PLOT_POINTS = 2000
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: keep the first and last points, then from
+    # each bucket the point spanning the largest triangle with the previously
+    # kept point and the average of the next bucket
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+def downsample(df, y_cols, n_out=MAX_PLOT_POINTS):
+    # Keep the union of each series' LTTB points so every line keeps its shape
+    if len(df) <= n_out:
+        return df
+    x = df["date"].to_numpy().astype(np.int64) / 1e9
+    per_series = max(n_out // len(y_cols), 3)
+    keep = []
+    for col in y_cols:
+        y = df[col].to_numpy()
+        valid = np.flatnonzero(~np.isnan(y))
+        keep.append(valid[lttb_indices(x[valid], y[valid], per_series)])
+    return df.iloc[np.unique(np.concatenate(keep))]
+
+def facet_line(df_dict, y_cols, y_label, title):
+    # One figure for all regions, one facet row each, instead of a figure per region
+    long = pd.concat((
+        downsample(df, y_cols).melt(id_vars=["date", "region"], value_vars=y_cols,
+                                    var_name="Type", value_name=y_label)
+        for df in df_dict.values()
+    ), ignore_index=True)
+    n_rows = len(df_dict)
+    fig = px.line(long, x="date", y=y_label, color="Type", facet_row="region",
+        labels={"date": "Date"}, title=title, render_mode="webgl",
+        height=max(350, 250 * n_rows), facet_row_spacing=min(0.05, 0.5 / n_rows))
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+    return fig
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_frame})
+def build_trend_figs(df_dict):
+    fig_temp = facet_line(df_dict, ["temperature_2m_min", "temperature_2m_mean", "temperature_2m_max"],
+                          "Temperature (°C)", "🌡️ Temperature")
+    fig_wind = facet_line(df_dict, ["wind_speed_10m_mean", "wind_speed_10m_max"],
+                          "Wind Speed (m/s)", "💨 Wind Speed")
+    fig_prep = facet_line(df_dict, ["precipitation_sum"], "Precipitation (mm)", "🌧️ Precipitation")
+    fig_prep.update_traces(line_color="#1f77b4", showlegend=False)
+    return fig_temp, fig_wind, fig_prep
+
+# Figures depend on the same inputs as the aggregates, so reruns that left them
+# alone skip even the cache lookup (and its content hashing)
+if st.session_state.get("trend_figs_key") != agg_key:
+    st.session_state["trend_figs"] = build_trend_figs(agg_data_dict)
+    st.session_state["trend_figs_key"] = agg_key
+fig_temp, fig_wind, fig_prep = st.session_state["trend_figs"]
+tab_temp, tab_wind, tab_prep = st.tabs(["🌡️ Temperature", "💨 Wind Speed", "🌧️ Precipitation"])
+tab_temp.plotly_chart(fig_temp, width="stretch")
+tab_wind.plotly_chart(fig_wind, width="stretch")
+tab_prep.plotly_chart(fig_prep, width="stretch")
 
 # --------------------------------------------
 # 🌀 Wind Rose
 # --------------------------------------------
 st.subheader("🌀 Wind Rose — Direction & Intensity (m/s)")
 
-def plot_wind_rose(df_dict):
+WIND_DIR_BINS = np.linspace(0, 360, 17)
+WIND_SPEED_BINS = [0, 1, 2, 4, 6, 9, 12, 99]
+WIND_SPEED_LABELS = ["0–1", "1–2", "2–4", "4–6", "6–9", "9–12", "12+"]
+WIND_SPEED_COLORS = px.colors.sample_colorscale("Turbo", len(WIND_SPEED_LABELS))
+
+def bin_wind_rose(df):
+    direction = df["wind_direction_10m_dominant"].to_numpy()
+    speed = df["wind_speed_10m_mean"].to_numpy()
+    valid = ~(np.isnan(direction) | np.isnan(speed))
+    # Shift by half a sector so each bin is centred on a compass point (N = 0°)
+    H, _, _ = np.histogram2d((direction[valid] + 11.25) % 360, speed[valid],
+                             bins=[WIND_DIR_BINS, WIND_SPEED_BINS])
+    return H
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_frame})
+def build_wind_rose_fig(df_dict):
     num_points = len(df_dict)
-    if num_points == 0:
-        st.warning("No region selected for wind rose plot.")
-        return
-
     cols = 2 if num_points > 1 else 1
     rows = ceil(num_points / cols)
 
@@ -271,16 +544,19 @@ def plot_wind_rose(df_dict):
     )
 
     row, col = 1, 1
+    shown = set()
     for region, df in df_dict.items():
-        df = df.dropna(subset=["wind_direction_10m_dominant", "wind_speed_10m_mean"])
-        rose = px.bar_polar(
-            df, r="wind_speed_10m_mean", theta="wind_direction_10m_dominant",
-            color="wind_speed_10m_mean", color_continuous_scale="Turbo",
-            range_color=[df["wind_speed_10m_mean"].min(), df["wind_speed_10m_mean"].max()]
-        )
-        for trace in rose.data:
-            trace.name = region
-            fig.add_trace(trace, row=row, col=col)
+        # One stacked Barpolar per speed band straight from the histogram
+        H = bin_wind_rose(df)
+        for j, label in enumerate(WIND_SPEED_LABELS):
+            if not H[:, j].any():
+                continue
+            fig.add_trace(go.Barpolar(
+                r=H[:, j], theta=WIND_DIR_BINS[:-1], name=label,
+                marker_color=WIND_SPEED_COLORS[j],
+                legendgroup=label, legendrank=j, showlegend=label not in shown
+            ), row=row, col=col)
+            shown.add(label)
         col += 1
         if col > cols:
             col = 1
@@ -290,14 +566,24 @@ def plot_wind_rose(df_dict):
         height=500 * rows,
         width=700 if cols == 1 else 1200,
         showlegend=True,
-        legend_title_text="Region",
-        coloraxis_colorbar=dict(title="Wind Speed (m/s)"),
+        legend_title_text="Wind Speed (m/s)",
         title_x=0.5,
         margin=dict(l=20, r=20, t=60, b=20)
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-plot_wind_rose(agg_data_dict)
+def plot_wind_rose(df_dict):
+    if not df_dict:
+        st.warning("No region selected for wind rose plot.")
+        return
+    if st.session_state.get("wind_rose_key") != agg_key:
+        st.session_state["wind_rose_fig"] = build_wind_rose_fig(df_dict)
+        st.session_state["wind_rose_key"] = agg_key
+    st.plotly_chart(st.session_state["wind_rose_fig"], width="stretch")
+
+# The rose only needs the two wind columns, so don't hand it the full aggregates
+wind_cols = ["wind_direction_10m_dominant", "wind_speed_10m_mean"]
+plot_wind_rose({region: df[wind_cols] for region, df in agg_data_dict.items()})
 
 # ======================================================
 # 🔮 NEW SECTION — Forecast Data (Windy API Integration)
@@ -306,7 +592,7 @@ plot_wind_rose(agg_data_dict)
 st.subheader("🔮 Forecast Data — Windy Point Forecast API")
 
 @st.cache_data(show_spinner=False)
-def get_windy_forecast(lat, lon, model="gfs", parameters=None):
+def get_windy_forecast(lat, lon, api_key, model="gfs", parameters=None):
     if parameters is None:
         parameters = ["temp", "wind", "precip"]
     url = "https://api.windy.com/api/point-forecast/v2"
@@ -316,16 +602,12 @@ def get_windy_forecast(lat, lon, model="gfs", parameters=None):
         "model": model,
         "parameters": parameters,
         "levels": ["surface"],
-        "key": st.secrets.get("WINDY_API_KEY", "DEMO_KEY")
+        "key": api_key
     }
     headers = {"Content-Type": "application/json"}
-    try:
-        resp = requests.post(url, headers=headers, data=json.dumps(payload))
-        resp.raise_for_status()
-        return resp.json()
-    except Exception as e:
-        st.warning(f"⚠️ Windy forecast fetch failed: {e}")
-        return {}
+    resp = session.post(url, headers=headers, data=json.dumps(payload), timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
 
 def parse_windy_to_df(windy_json, region):
     if not windy_json:
@@ -337,39 +619,68 @@ def parse_windy_to_df(windy_json, region):
     if not ts:
         return pd.DataFrame()
 
-    records = []
-    for i, t in enumerate(ts):
-        rec = {"time": pd.to_datetime(t, unit="s"), "region": region}
-        for k, arr in fc.items():
-            if k != "ts" and isinstance(arr, list) and i < len(arr):
-                rec[k] = arr[i]
-        records.append(rec)
-    return pd.DataFrame(records)
+    cols = {k: v for k, v in fc.items() if k != "ts" and isinstance(v, list) and len(v) == len(ts)}
+    df = pd.DataFrame(cols)
+    df.insert(0, "time", pd.to_datetime(ts, unit="s", cache=True))
+    df.insert(1, "region", region)
+    for c in df.select_dtypes("float64").columns:
+        df[c] = df[c].astype("float32")
+    return df
+
+# Each point is a separate POST, so issue them concurrently rather than one after another
+try:
+    windy_api_key = st.secrets.get("WINDY_API_KEY")
+except FileNotFoundError:
+    windy_api_key = None
+
+windy_jsons = {}
+if not windy_api_key:
+    # Without a key every POST would just come back 401/403
+    st.info("Configure `WINDY_API_KEY` in Streamlit secrets to enable forecasts.")
+elif locations:
+    with ThreadPoolExecutor(max_workers=min(16, len(locations))) as ex:
+        futures = {ex.submit(get_windy_forecast, lat, lon, windy_api_key): (lat, lon) for lat, lon in locations}
+        for future in as_completed(futures):
+            try:
+                windy_jsons[futures[future]] = future.result()
+            except Exception as e:
+                st.warning(f"⚠️ Windy forecast fetch failed: {e}")
+                windy_jsons[futures[future]] = {}
 
 forecast_dict = {}
-for region, (lat, lon) in coords.items():
-    windy_json = get_windy_forecast(lat, lon)
-    df_fc = parse_windy_to_df(windy_json, region)
+for region, loc in region_locs.items():
+    df_fc = parse_windy_to_df(windy_jsons.get(loc, {}), region)
     if not df_fc.empty:
         forecast_dict[region] = df_fc
 
+FORECAST_PANELS = [
+    ("temp", "Temperature (°C)", go.Scatter),
+    ("wind", "Wind Speed (m/s)", go.Scatter),
+    ("precip", "Precipitation (mm)", go.Bar),
+]
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: hash_frame})
+def build_forecast_fig(df_fc, region):
+    # Stack the panels in one figure so each region ships a single chart
+    panels = [panel for panel in FORECAST_PANELS if panel[0] in df_fc.columns]
+    if not panels:
+        return None
+    fig = make_subplots(
+        rows=len(panels), cols=1, shared_xaxes=True,
+        subplot_titles=[f"{label.split(' (')[0]} Forecast ({region})" for _, label, _ in panels]
+    )
+    for row, (col, label, trace) in enumerate(panels, start=1):
+        fig.add_trace(trace(x=df_fc["time"], y=df_fc[col], name=label), row=row, col=1)
+        fig.update_yaxes(title_text=label, row=row, col=1)
+    fig.update_xaxes(title_text="Date", row=len(panels), col=1)
+    fig.update_layout(height=300 * len(panels), showlegend=False, margin=dict(l=20, r=20, t=60, b=20))
+    return fig
+
 if forecast_dict:
     for region, df_fc in forecast_dict.items():
         with st.expander(f"🌤️ {region} — 7-Day Forecast", expanded=False):
-            if "temp" in df_fc.columns:
-                fig_fc_temp = px.line(df_fc, x="time", y="temp",
-                                      labels={"temp": "Temperature (°C)", "time": "Date"},
-                                      title=f"Temperature Forecast ({region})")
-                st.plotly_chart(fig_fc_temp, use_container_width=True)
-            if "wind" in df_fc.columns:
-                fig_fc_wind = px.line(df_fc, x="time", y="wind",
-                                      labels={"wind": "Wind Speed (m/s)", "time": "Date"},
-                                      title=f"Wind Forecast ({region})")
-                st.plotly_chart(fig_fc_wind, use_container_width=True)
-            if "precip" in df_fc.columns:
-                fig_fc_precip = px.bar(df_fc, x="time", y="precip",
-                                       labels={"precip": "Precipitation (mm)", "time": "Date"},
-                                       title=f"Precipitation Forecast ({region})")
-                st.plotly_chart(fig_fc_precip, use_container_width=True)
-else:
+            fig_fc = build_forecast_fig(df_fc, region)
+            if fig_fc is not None:
+                st.plotly_chart(fig_fc, width="stretch")
+elif windy_api_key:
     st.info("No forecast data available (Windy API may require valid key or trial usage limit reached).")